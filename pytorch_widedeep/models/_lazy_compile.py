@@ -0,0 +1,23 @@
+import torch
+
+from pytorch_widedeep.wdtypes import *  # noqa: F403
+
+
+class LazyCompileMixin:
+    r"""Adds the option of compiling parts of a model with ``torch.compile``.
+    The functions are compiled the first time they are requested via
+    ``_lazy_compile``. Compiled functions cannot be pickled, so they are
+    dropped when the model is pickled (or deep-copied) and re-compiled at
+    the first forward pass after loading it
+    """
+
+    def _lazy_compile(self, name: str, fn: Callable, **compile_kwargs) -> Callable:
+        compiled_fns = self.__dict__.setdefault("_compiled_fns", {})
+        if name not in compiled_fns:
+            compiled_fns[name] = torch.compile(fn, **compile_kwargs)
+        return compiled_fns[name]
+
+    def __getstate__(self):
+        state = super().__getstate__()  # type: ignore[misc]
+        state.pop("_compiled_fns", None)
+        return state
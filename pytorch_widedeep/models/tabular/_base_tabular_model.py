@@ -1,3 +1,7 @@
+import warnings
+from copy import deepcopy
+from typing import TypeVar
+
 from torch import nn
 
 from pytorch_widedeep.wdtypes import *  # noqa: F403
@@ -23,6 +27,7 @@ class BaseTabularModelWithoutAttention(nn.Module):
         cont_embed_dropout: float,
         use_cont_bias: bool,
         cont_embed_activation: Optional[str],
+        fused_cat_embed: bool = False,
     ):
         super().__init__()
 
@@ -51,6 +56,7 @@ class BaseTabularModelWithoutAttention(nn.Module):
             cont_embed_dim,
             cont_embed_dropout,
             use_cont_bias,
+            fused_cat_embed,
         )
         self.cat_embed_act_fn = (
             get_activation_fn(cat_embed_activation)
@@ -63,7 +69,9 @@ class BaseTabularModelWithoutAttention(nn.Module):
             else None
         )
 
-    def _get_embeddings(self, X: Tensor) -> Tensor:
+    def _get_embeddings(self, X: Tensor, out: Optional[Tensor] = None) -> Tensor:
+        # 'out' is an optional pre-allocated tensor where the concatenation
+        # of the categorical and continuous embeddings will be written
         x_cat, x_cont = self.cat_and_cont_embed(X)
         if x_cat is not None:
             x = (
@@ -74,7 +82,14 @@ class BaseTabularModelWithoutAttention(nn.Module):
         if x_cont is not None:
             if self.cont_embed_act_fn is not None:
                 x_cont = self.cont_embed_act_fn(x_cont)
-            x = torch.cat([x, x_cont], 1) if x_cat is not None else x_cont
+            if x_cat is None:
+                x = x_cont
+            else:
+                if out is not None and out.dtype != torch.promote_types(
+                    x.dtype, x_cont.dtype
+                ):
+                    out = None
+                x = torch.cat([x, x_cont], 1, out=out)
         return x
 
 
@@ -163,3 +178,103 @@ class BaseTabularModelWithAttention(nn.Module):
     @property
     def attention_weights(self):
         raise NotImplementedError
+
+    def _check_attn_weights_collected(self):
+        # models that can skip storing the attention weights expose a
+        # 'collect_attn_weights' attribute
+        if not getattr(self, "collect_attn_weights", True):
+            raise ValueError(
+                "The attention weights are only stored if 'collect_attn_weights' "
+                "is 'True'"
+            )
+
+
+class MixedPrecisionMixin:
+    r"""Adds the option of running the forward pass of a model under
+    ``torch.autocast``. The forward pass of the model must be run within
+    ``self._autocast(X)`` and its output cast back to ``float32`` if
+    ``amp_dtype`` is not ``None``
+    """
+
+    amp_dtype: Optional[torch.dtype] = None
+
+    def set_precision(self, precision: Optional[str] = None):
+        r"""Sets the precision used to run the forward pass under
+        ``torch.autocast``. The output of the model is always ``float32``
+
+        Parameters
+        ----------
+        precision: str, Optional, default = None
+            One of `'bfloat16'`, `'float16'` or ``None``. If ``None`` the model
+            runs in full precision. `'float16'` is meant for inference only:
+            the ``Trainer`` does not scale the loss, so ``float16`` gradients
+            can underflow. A warning is raised if `'float16'` is set while the
+            model is in training mode
+        """
+        if precision not in [None, "bfloat16", "float16"]:
+            raise ValueError(
+                "'precision' must be one of 'bfloat16', 'float16' or None. "
+                f"Got {precision}"
+            )
+        if precision == "float16" and self.training:  # type: ignore[attr-defined]
+            warnings.warn(
+                "'float16' is meant for inference only. Training in 'float16' "
+                "without loss scaling can cause the gradients to underflow. "
+                "Use 'bfloat16' for training",
+                UserWarning,
+            )
+        self.amp_dtype = getattr(torch, precision) if precision is not None else None
+
+    def _autocast(self, X: Tensor) -> torch.autocast:
+        return torch.autocast(
+            device_type=X.device.type,
+            dtype=self.amp_dtype,
+            enabled=self.amp_dtype is not None,
+        )
+
+
+ModelType = TypeVar("ModelType", bound=nn.Module)
+
+
+def quantize_linear_layers(
+    model: ModelType, module_names: List[str], backend: Optional[str]
+) -> ModelType:
+    # int8 dynamic quantization of the linear layers in 'module_names'.
+    # Returns a copy of the model in eval mode and on CPU. The global
+    # quantized engine is only changed while the copy is quantized
+    if backend is None:
+        backend = torch.backends.quantized.engine
+    if backend not in torch.backends.quantized.supported_engines:
+        raise ValueError(
+            f"'backend' must be one of {torch.backends.quantized.supported_engines}. "
+            f"Got {backend}"
+        )
+
+    # tensors attached to the graph of the last forward pass (e.g. stored
+    # attention weights) cannot be deep-copied, and are not copied
+    memo: Dict[int, Any] = {
+        id(t): None
+        for m in model.modules()
+        for t in m.__dict__.values()
+        if isinstance(t, Tensor) and t.grad_fn is not None
+    }
+    q_model = deepcopy(model, memo).cpu().eval()
+    # autocast and int8 dynamic quantization do not compose
+    q_model.amp_dtype = None
+
+    engine = torch.backends.quantized.engine
+    torch.backends.quantized.engine = backend
+    try:
+        for name in module_names:
+            module = getattr(q_model, name, None)
+            if module is not None:
+                setattr(
+                    q_model,
+                    name,
+                    torch.ao.quantization.quantize_dynamic(
+                        module, {nn.Linear}, dtype=torch.qint8
+                    ),
+                )
+    finally:
+        torch.backends.quantized.engine = engine
+    return q_model
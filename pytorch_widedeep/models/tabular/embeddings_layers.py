@@ -176,6 +176,153 @@ class DiffSizeCatEmbeddings(nn.Module):
         return x
 
 
+class FusedDiffSizeCatEmbeddings(nn.Module):
+    r"""Alternative to ``DiffSizeCatEmbeddings`` where the categorical
+    columns that share the same embedding dimension are stored in a single
+    table. The encodings of each column are shifted by an offset so that one
+    lookup per embedding dimension (normally just one or two) returns the
+    embeddings of all the columns with that dimension, instead of one lookup
+    per column.
+
+    Row 0 of each table is shared by all its columns and reserved for
+    padding/unseen categories. The output follows the order of
+    ``embed_input``, as in ``DiffSizeCatEmbeddings``, and state dicts saved
+    with the per-column layout of ``DiffSizeCatEmbeddings`` can be loaded
+    into this module
+    """
+
+    def __init__(
+        self,
+        column_idx: Dict[str, int],
+        embed_input: List[Tuple[str, int, int]],
+        embed_dropout: float,
+        use_bias: bool,
+    ):
+        super(FusedDiffSizeCatEmbeddings, self).__init__()
+
+        self.column_idx = column_idx
+        self.embed_input = embed_input
+        self.use_bias = use_bias
+
+        col_dims = [dim for _, _, dim in self.embed_input]
+        # unique dims, in order of appearance
+        self.embed_dims = list(dict.fromkeys(col_dims))
+        self.emb_out_dim: int = int(np.sum(col_dims))
+
+        out_start = np.cumsum([0] + col_dims[:-1])
+        self.embed = nn.ModuleDict()
+        for dim in self.embed_dims:
+            group = [i for i, d in enumerate(col_dims) if d == dim]
+            n_embed = [self.embed_input[i][1] for i in group]
+            self.register_buffer(
+                f"cat_idx_{dim}",
+                torch.tensor([column_idx[self.embed_input[i][0]] for i in group]),
+                persistent=False,
+            )
+            self.register_buffer(
+                f"cat_offsets_{dim}",
+                torch.tensor(np.cumsum([0] + n_embed[:-1])),
+                persistent=False,
+            )
+            # positions of this group's embeddings in the output
+            self.register_buffer(
+                f"out_idx_{dim}",
+                torch.tensor([out_start[i] + j for i in group for j in range(dim)]),
+                persistent=False,
+            )
+            self.embed["emb_layer_" + str(dim)] = nn.Embedding(
+                sum(n_embed) + 1, dim, padding_idx=0
+            )
+        self.embedding_dropout = nn.Dropout(embed_dropout)
+
+        if use_bias:
+            # same bounds as in DiffSizeCatEmbeddings, one per column
+            self.bias = nn.Parameter(
+                torch.cat(
+                    [
+                        nn.init.uniform_(
+                            torch.Tensor(dim), -1 / math.sqrt(dim), 1 / math.sqrt(dim)
+                        )
+                        for dim in col_dims
+                    ]
+                )
+            )
+        else:
+            self.bias = None
+
+    def forward(self, X: Tensor) -> Tensor:
+        if len(self.embed_dims) == 1:
+            x = self._group_embeddings(X, self.embed_dims[0])
+        else:
+            x = torch.empty(
+                X.size(0),
+                self.emb_out_dim,
+                dtype=self.embed["emb_layer_" + str(self.embed_dims[0])].weight.dtype,
+                device=X.device,
+            )
+            for dim in self.embed_dims:
+                x.index_copy_(
+                    1, getattr(self, f"out_idx_{dim}"), self._group_embeddings(X, dim)
+                )
+        if self.bias is not None:
+            x = x + self.bias.unsqueeze(0)
+        x = self.embedding_dropout(x)
+        return x
+
+    def _group_embeddings(self, X: Tensor, dim: int) -> Tensor:
+        # index_select returns a new tensor, so the offsets can be added in
+        # place without modifying X
+        idx = X.index_select(1, getattr(self, f"cat_idx_{dim}")).long()
+        pad = idx == 0
+        idx.add_(getattr(self, f"cat_offsets_{dim}")).masked_fill_(pad, 0)
+        return self.embed["emb_layer_" + str(dim)](idx).view(X.size(0), -1)
+
+    def col_embeddings(self, col: str) -> Tensor:
+        r"""Returns the embedding matrix of one column, indexed by its
+        encodings (i.e. row 0 corresponds to padding/unseen categories)
+        """
+        _, val, dim = [ei for ei in self.embed_input if ei[0] == col][0]
+        group = [ei[0] for ei in self.embed_input if ei[2] == dim]
+        offset = getattr(self, f"cat_offsets_{dim}")[group.index(col)]
+        rows = torch.cat(
+            [
+                torch.zeros(1, dtype=torch.long, device=offset.device),
+                torch.arange(1, val + 1, device=offset.device) + offset,
+            ]
+        )
+        return self.embed["emb_layer_" + str(dim)].weight[rows]
+
+    def _load_from_state_dict(self, state_dict, prefix, *args, **kwargs):
+        # packs the per-column tables (and biases) of a state dict saved with
+        # DiffSizeCatEmbeddings into the per-dim tables of this module
+        old_keys = {
+            col: prefix + "embed_layers.emb_layer_" + col.replace(".", "_") + ".weight"
+            for col, _, _ in self.embed_input
+        }
+        if all(key in state_dict for key in old_keys.values()):
+            for dim in self.embed_dims:
+                weights = [
+                    state_dict.pop(old_keys[col])
+                    for col, _, d in self.embed_input
+                    if d == dim
+                ]
+                # row 0 of each per-column table is its padding row
+                pad = torch.zeros_like(weights[0][:1])
+                key = prefix + "embed.emb_layer_" + str(dim) + ".weight"
+                state_dict[key] = torch.cat([pad] + [w[1:] for w in weights])
+            bias_keys = [
+                prefix + "biases.bias_" + col for col, _, _ in self.embed_input
+            ]
+            if self.use_bias and all(key in state_dict for key in bias_keys):
+                state_dict[prefix + "bias"] = torch.cat(
+                    [state_dict.pop(key) for key in bias_keys]
+                )
+        super()._load_from_state_dict(state_dict, prefix, *args, **kwargs)
+
+
+CatEmbeddings = Union[DiffSizeCatEmbeddings, FusedDiffSizeCatEmbeddings]
+
+
 class SameSizeCatEmbeddings(nn.Module):
     def __init__(
         self,
@@ -204,7 +351,11 @@ class SameSizeCatEmbeddings(nn.Module):
             }
 
         categorical_cols = [ei[0] for ei in embed_input]
-        self.cat_idx = [self.column_idx[col] for col in categorical_cols]
+        self.register_buffer(
+            "cat_idx",
+            torch.tensor([self.column_idx[col] for col in categorical_cols]),
+            persistent=False,
+        )
 
         if use_bias:
             if shared_embed:
@@ -259,13 +410,13 @@ class SameSizeCatEmbeddings(nn.Module):
             ]
             x = torch.cat(cat_embed, 1)
         else:
-            x = self.embed(X[:, self.cat_idx].long())
+            # the categorical columns are label encoded into a single index
+            # space, so one lookup returns the (B, n_cat, D) tensor
+            x = self.embed(X.index_select(1, self.cat_idx).long())
             if self.bias is not None:
                 if self.with_cls_token:
                     # no bias to be learned for the [CLS] token
-                    bias = torch.cat(
-                        [torch.zeros(1, self.bias.shape[1], device=x.device), self.bias]
-                    )
+                    bias = F.pad(self.bias, (0, 0, 1, 0))
                 else:
                     bias = self.bias
                 x = x + bias.unsqueeze(0)
@@ -287,6 +438,7 @@ class DiffSizeCatAndContEmbeddings(nn.Module):
         cont_embed_dim: int,
         cont_embed_dropout: float,
         use_cont_bias: bool,
+        fused_cat_embed: bool = False,
     ):
         super(DiffSizeCatAndContEmbeddings, self).__init__()
 
@@ -296,17 +448,26 @@ class DiffSizeCatAndContEmbeddings(nn.Module):
         self.cont_embed_dim = cont_embed_dim
 
         # Categorical
-        if self.cat_embed_input is not None:
-            self.cat_embed = DiffSizeCatEmbeddings(
-                column_idx, cat_embed_input, cat_embed_dropout, use_cat_bias
-            )
+        if self.cat_embed_input:
+            if fused_cat_embed:
+                self.cat_embed: CatEmbeddings = FusedDiffSizeCatEmbeddings(
+                    column_idx, cat_embed_input, cat_embed_dropout, use_cat_bias
+                )
+            else:
+                self.cat_embed = DiffSizeCatEmbeddings(
+                    column_idx, cat_embed_input, cat_embed_dropout, use_cat_bias
+                )
             self.cat_out_dim = int(np.sum([embed[2] for embed in self.cat_embed_input]))
         else:
             self.cat_out_dim = 0
 
         # Continuous
         if continuous_cols is not None:
-            self.cont_idx = [column_idx[col] for col in continuous_cols]
+            self.register_buffer(
+                "cont_idx",
+                torch.tensor([column_idx[col] for col in continuous_cols]),
+                persistent=False,
+            )
             if cont_norm_layer == "layernorm":
                 self.cont_norm: NormLayers = nn.LayerNorm(len(continuous_cols))
             elif cont_norm_layer == "batchnorm":
@@ -330,13 +491,13 @@ class DiffSizeCatAndContEmbeddings(nn.Module):
 
     def forward(self, X: Tensor) -> Tuple[Tensor, Any]:
 
-        if self.cat_embed_input is not None:
+        if self.cat_embed_input:
             x_cat = self.cat_embed(X)
         else:
             x_cat = None
 
         if self.continuous_cols is not None:
-            x_cont = self.cont_norm((X[:, self.cont_idx].float()))
+            x_cont = self.cont_norm(X.index_select(1, self.cont_idx).float())
             if self.embed_continuous:
                 x_cont = self.cont_embed(x_cont)
                 x_cont = einops.rearrange(x_cont, "b s d -> b (s d)")
@@ -386,7 +547,11 @@ class SameSizeCatAndContEmbeddings(nn.Module):
             )
         # Continuous
         if continuous_cols is not None:
-            self.cont_idx = [column_idx[col] for col in continuous_cols]
+            self.register_buffer(
+                "cont_idx",
+                torch.tensor([column_idx[col] for col in continuous_cols]),
+                persistent=False,
+            )
             if cont_norm_layer == "layernorm":
                 self.cont_norm: NormLayers = nn.LayerNorm(len(continuous_cols))
             elif cont_norm_layer == "batchnorm":
@@ -409,7 +574,7 @@ class SameSizeCatAndContEmbeddings(nn.Module):
             x_cat = None
 
         if self.continuous_cols is not None:
-            x_cont = self.cont_norm((X[:, self.cont_idx].float()))
+            x_cont = self.cont_norm(X.index_select(1, self.cont_idx).float())
             if self.embed_continuous:
                 x_cont = self.cont_embed(x_cont)
         else:
@@ -1,33 +1,57 @@
 import math
 
-import einops
+import torch.nn.functional as F
 from torch import nn, einsum
 
 from pytorch_widedeep.wdtypes import *  # noqa: F403
+from pytorch_widedeep.models._lazy_compile import LazyCompileMixin
 
 
-class ContextAttention(nn.Module):
+class ContextAttention(LazyCompileMixin, nn.Module):
     r"""Attention mechanism inspired by `Hierarchical Attention Networks for
     Document Classification
     <https://www.cs.cmu.edu/~./hovy/papers/16HLT-hierarchical-attention-networks.pdf>`_
+
+    If ``compile_score`` is ``True`` the input projection and the ``tanh``
+    activation are compiled with ``torch.compile`` so that both run as a
+    single fused kernel. The compilation takes place at the first forward pass
     """
 
-    def __init__(self, input_dim: int, dropout: float, sum_along_seq: bool = False):
+    def __init__(
+        self,
+        input_dim: int,
+        dropout: float,
+        sum_along_seq: bool = False,
+        compile_score: bool = False,
+    ):
         super(ContextAttention, self).__init__()
 
         self.inp_proj = nn.Linear(input_dim, input_dim)
         self.context = nn.Linear(input_dim, 1, bias=False)
         self.dropout = nn.Dropout(dropout)
         self.sum_along_seq = sum_along_seq
+        self.compile_score = compile_score
 
     def forward(self, X: Tensor) -> Tensor:
-        scores = torch.tanh_(self.inp_proj(X))
+        scores = self._score_fn()(X)
         attn_weights = self.context(scores).softmax(dim=1)
         self.attn_weights = attn_weights.squeeze(2)
         attn_weights = self.dropout(attn_weights)
-        output = (attn_weights * X).sum(1) if self.sum_along_seq else (attn_weights * X)
+        if self.sum_along_seq:
+            # (b, 1, s) @ (b, s, d) -> (b, d), no (b, s, d) intermediate
+            output = torch.bmm(attn_weights.transpose(1, 2), X).squeeze(1)
+        else:
+            output = attn_weights * X
         return output
 
+    def _score(self, X: Tensor) -> Tensor:
+        return torch.tanh_(self.inp_proj(X))
+
+    def _score_fn(self) -> Callable:
+        if not self.compile_score:
+            return self._score
+        return self._lazy_compile("score", self._score)
+
 
 class QueryKeySelfAttention(nn.Module):
     r"""Attention mechanism inspired by the well known multi-head attention. Here,
@@ -40,6 +64,11 @@ class QueryKeySelfAttention(nn.Module):
     heavily overfit tabular. Therefore, by reducing the number of trainable
     parameters and multiply directly by the incoming tensor we help
     mitigating such overfitting
+
+    If ``need_weights`` is ``False`` the attention weights are not stored
+    and the attention is computed with
+    ``torch.nn.functional.scaled_dot_product_attention``, which dispatches to
+    fused kernels when available
     """
 
     def __init__(
@@ -48,6 +77,7 @@ class QueryKeySelfAttention(nn.Module):
         dropout: float,
         use_bias: bool,
         n_heads: int,
+        need_weights: bool = True,
     ):
         super(QueryKeySelfAttention, self).__init__()
 
@@ -55,6 +85,7 @@ class QueryKeySelfAttention(nn.Module):
 
         self.head_dim = input_dim // n_heads
         self.n_heads = n_heads
+        self.need_weights = need_weights
         self.qk_proj = nn.Linear(input_dim, input_dim * 2, bias=use_bias)
         self.dropout = nn.Dropout(dropout)
 
@@ -65,15 +96,26 @@ class QueryKeySelfAttention(nn.Module):
         # m: used to refer indistinctively to s or l
         # h: number of attention heads,
         # d: head_dim
-        q, k = self.qk_proj(X).chunk(2, dim=-1)
-        q, k, x_rearr = map(
-            lambda t: einops.rearrange(t, "b m (h d) -> b h m d", h=self.n_heads),
-            (q, k, X),
-        )
-        scores = einsum("b h s d, b h l d -> b h s l", q, k) / math.sqrt(self.head_dim)
-        attn_weights = scores.softmax(dim=-1)
-        self.attn_weights = attn_weights
-        attn_weights = self.dropout(attn_weights)
-        attn_output = einsum("b h s l, b h l d -> b h s d", attn_weights, x_rearr)
-        output = einops.rearrange(attn_output, "b h s d -> b s (h d)", h=self.n_heads)
+        b, m = X.shape[:2]
+        h, d = self.n_heads, self.head_dim
+        # (b, m, 2 * h * d) -> (2, b, h, m, d), i.e. the same split as
+        # chunk(2, dim=-1) followed by separating the heads
+        q, k = self.qk_proj(X).view(b, m, 2, h, d).permute(2, 0, 3, 1, 4)
+        x_rearr = X.reshape(b, m, h, d).transpose(1, 2)
+        if self.need_weights:
+            scores = einsum("b h s d, b h l d -> b h s l", q, k) / math.sqrt(
+                self.head_dim
+            )
+            attn_weights = scores.softmax(dim=-1)
+            self.attn_weights = attn_weights
+            attn_weights = self.dropout(attn_weights)
+            attn_output = einsum("b h s l, b h l d -> b h s d", attn_weights, x_rearr)
+        else:
+            attn_output = F.scaled_dot_product_attention(
+                q,
+                k,
+                x_rearr,
+                dropout_p=self.dropout.p if self.training else 0.0,
+            )
+        output = attn_output.transpose(1, 2).contiguous().view(b, m, h * d)
         return output
@@ -18,11 +18,12 @@ class ContextAttentionEncoder(nn.Module):
         dropout: float,
         with_addnorm: bool,
         activation: str,
+        compile_score: bool = False,
     ):
         super(ContextAttentionEncoder, self).__init__()
 
         self.with_addnorm = with_addnorm
-        self.attn = ContextAttention(input_dim, dropout)
+        self.attn = ContextAttention(input_dim, dropout, compile_score=compile_score)
         if with_addnorm:
             self.attn_addnorm = AddNorm(input_dim, dropout)
             self.slp_addnorm = AddNorm(input_dim, dropout)
@@ -52,11 +53,14 @@ class SelfAttentionEncoder(nn.Module):
         n_heads: int,
         with_addnorm: bool,
         activation: str,
+        need_weights: bool = True,
     ):
         super(SelfAttentionEncoder, self).__init__()
 
         self.with_addnorm = with_addnorm
-        self.attn = QueryKeySelfAttention(input_dim, dropout, use_bias, n_heads)
+        self.attn = QueryKeySelfAttention(
+            input_dim, dropout, use_bias, n_heads, need_weights
+        )
         if with_addnorm:
             self.attn_addnorm = AddNorm(input_dim, dropout)
             self.slp_addnorm = AddNorm(input_dim, dropout)
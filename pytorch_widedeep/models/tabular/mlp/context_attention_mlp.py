@@ -81,6 +81,11 @@ class ContextAttentionMLP(BaseTabularModelWithAttention):
         and `'gelu'` are supported.
     n_blocks: int, default = 3
         Number of attention blocks
+    compile_score: bool, default = False
+        Boolean indicating if the input projection and the ``tanh``
+        activation of each attention block will be compiled with
+        ``torch.compile`` so that both run as a single fused kernel. The
+        compilation happens at the first forward pass
 
     Attributes
     ----------
@@ -125,6 +130,7 @@ class ContextAttentionMLP(BaseTabularModelWithAttention):
         with_addnorm: bool = False,
         attn_activation: str = "leaky_relu",
         n_blocks: int = 3,
+        compile_score: bool = False,
     ):
         super(ContextAttentionMLP, self).__init__(
             column_idx=column_idx,
@@ -149,6 +155,7 @@ class ContextAttentionMLP(BaseTabularModelWithAttention):
         self.with_addnorm = with_addnorm
         self.attn_activation = attn_activation
         self.n_blocks = n_blocks
+        self.compile_score = compile_score
 
         self.with_cls_token = "cls_token" in column_idx
         self.n_cat = len(cat_embed_input) if cat_embed_input is not None else 0
@@ -165,6 +172,7 @@ class ContextAttentionMLP(BaseTabularModelWithAttention):
                     attn_dropout,
                     with_addnorm,
                     attn_activation,
+                    compile_score,
                 ),
             )
 
@@ -84,6 +84,12 @@ class SelfAttentionMLP(BaseTabularModelWithAttention):
         and `'gelu'` are supported.
     n_blocks: int, default = 3
         Number of attention blocks
+    collect_attn_weights: bool, default = True
+        Boolean indicating if the attention weights will be stored at every
+        forward pass (see the ``attention_weights`` property). If ``False``
+        the attention is computed with
+        ``torch.nn.functional.scaled_dot_product_attention``, which uses
+        fused kernels when available and does not materialise the weights
 
     Attributes
     ----------
@@ -130,6 +136,7 @@ class SelfAttentionMLP(BaseTabularModelWithAttention):
         with_addnorm: bool = False,
         attn_activation: str = "leaky_relu",
         n_blocks: int = 3,
+        collect_attn_weights: bool = True,
     ):
         super(SelfAttentionMLP, self).__init__(
             column_idx=column_idx,
@@ -156,6 +163,7 @@ class SelfAttentionMLP(BaseTabularModelWithAttention):
         self.with_addnorm = with_addnorm
         self.attn_activation = attn_activation
         self.n_blocks = n_blocks
+        self.collect_attn_weights = collect_attn_weights
 
         self.with_cls_token = "cls_token" in column_idx
         self.n_cat = len(cat_embed_input) if cat_embed_input is not None else 0
@@ -174,6 +182,7 @@ class SelfAttentionMLP(BaseTabularModelWithAttention):
                     n_heads,
                     with_addnorm,
                     attn_activation,
+                    collect_attn_weights,
                 ),
             )
 
@@ -202,5 +211,9 @@ class SelfAttentionMLP(BaseTabularModelWithAttention):
 
         Where *N* is the batch size, *H* is the number of attention heads
         and *F* is the number of features/columns in the dataset
+
+        The weights are only stored if ``collect_attn_weights`` is ``True``
+        (default)
         """
+        self._check_attn_weights_collected()
         return [blk.attn.attn_weights for blk in self.attention_blks]
@@ -2,10 +2,23 @@ from collections import OrderedDict
 
 from torch import nn
 from torch.nn import Module
+from torch.nn.utils.fusion import fuse_linear_bn_eval
 
 from pytorch_widedeep.wdtypes import *  # noqa: F403
 
 
+def get_norm_layer(norm_layer: str, dim: int) -> nn.Module:
+    if norm_layer == "batchnorm":
+        return nn.BatchNorm1d(dim)
+    elif norm_layer == "layernorm":
+        return nn.LayerNorm(dim)
+    else:
+        raise ValueError(
+            "'norm_layer' must be one of 'batchnorm' or 'layernorm'. "
+            f"Got {norm_layer}"
+        )
+
+
 class BasicBlock(nn.Module):
     # inspired by https://github.com/pytorch/vision/blob/master/torchvision/models/resnet.py#L37
     def __init__(
@@ -15,6 +28,7 @@ class BasicBlock(nn.Module):
         dropout: float = 0.0,
         simplify: bool = False,
         resize: Module = None,
+        norm_layer: str = "batchnorm",
     ):
         super(BasicBlock, self).__init__()
 
@@ -22,7 +36,7 @@ class BasicBlock(nn.Module):
         self.resize = resize
 
         self.lin1 = nn.Linear(inp, out, bias=False)
-        self.bn1 = nn.BatchNorm1d(out)
+        self.bn1 = get_norm_layer(norm_layer, out)
         self.leaky_relu = nn.LeakyReLU(inplace=True)
         if dropout > 0.0:
             self.dropout = True
@@ -32,7 +46,7 @@ class BasicBlock(nn.Module):
 
         if not self.simplify:
             self.lin2 = nn.Linear(out, out, bias=False)
-            self.bn2 = nn.BatchNorm1d(out)
+            self.bn2 = get_norm_layer(norm_layer, out)
 
     def forward(self, X: Tensor) -> Tensor:
 
@@ -56,10 +70,31 @@ class BasicBlock(nn.Module):
 
         return out
 
+    def fuse_for_inference(self):
+        r"""Folds the batch normalisation layers into the preceding linear
+        layers. Must be called in eval mode, i.e. after ``model.eval()``
+        """
+        if self.training:
+            raise ValueError("'fuse_for_inference' can only be used in eval mode")
+
+        if isinstance(self.bn1, nn.BatchNorm1d):
+            self.lin1 = fuse_linear_bn_eval(self.lin1, self.bn1)
+            self.bn1 = nn.Identity()
+        if not self.simplify and isinstance(self.bn2, nn.BatchNorm1d):
+            self.lin2 = fuse_linear_bn_eval(self.lin2, self.bn2)
+            self.bn2 = nn.Identity()
+        if self.resize is not None and isinstance(self.resize[-1], nn.BatchNorm1d):
+            self.resize = nn.Sequential(fuse_linear_bn_eval(*self.resize))
+
 
 class DenseResnet(nn.Module):
     def __init__(
-        self, input_dim: int, blocks_dims: List[int], dropout: float, simplify: bool
+        self,
+        input_dim: int,
+        blocks_dims: List[int],
+        dropout: float,
+        simplify: bool,
+        norm_layer: str = "batchnorm",
     ):
         super(DenseResnet, self).__init__()
 
@@ -68,7 +103,7 @@ class DenseResnet(nn.Module):
                 OrderedDict(
                     [
                         ("lin_inp", nn.Linear(input_dim, blocks_dims[0], bias=False)),
-                        ("bn_inp", nn.BatchNorm1d(blocks_dims[0])),
+                        ("bn_inp", get_norm_layer(norm_layer, blocks_dims[0])),
                     ]
                 )
             )
@@ -79,14 +114,36 @@ class DenseResnet(nn.Module):
             if blocks_dims[i - 1] != blocks_dims[i]:
                 resize = nn.Sequential(
                     nn.Linear(blocks_dims[i - 1], blocks_dims[i], bias=False),
-                    nn.BatchNorm1d(blocks_dims[i]),
+                    get_norm_layer(norm_layer, blocks_dims[i]),
                 )
             self.dense_resnet.add_module(
                 "block_{}".format(i - 1),
                 BasicBlock(
-                    blocks_dims[i - 1], blocks_dims[i], dropout, simplify, resize
+                    blocks_dims[i - 1],
+                    blocks_dims[i],
+                    dropout,
+                    simplify,
+                    resize,
+                    norm_layer,
                 ),
             )
 
     def forward(self, X: Tensor) -> Tensor:
         return self.dense_resnet(X)
+
+    def fuse_for_inference(self):
+        r"""Folds all the batch normalisation layers into the preceding
+        linear layers. Must be called in eval mode, i.e. after
+        ``model.eval()``
+        """
+        if self.training:
+            raise ValueError("'fuse_for_inference' can only be used in eval mode")
+
+        if isinstance(getattr(self.dense_resnet, "bn_inp", None), nn.BatchNorm1d):
+            self.dense_resnet.lin_inp = fuse_linear_bn_eval(
+                self.dense_resnet.lin_inp, self.dense_resnet.bn_inp
+            )
+            self.dense_resnet.bn_inp = nn.Identity()
+        for blk in self.dense_resnet.children():
+            if isinstance(blk, BasicBlock):
+                blk.fuse_for_inference()
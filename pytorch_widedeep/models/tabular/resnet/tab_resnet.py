@@ -1,12 +1,19 @@
+from torch import nn
+
 from pytorch_widedeep.wdtypes import *  # noqa: F403
+from pytorch_widedeep.models._lazy_compile import LazyCompileMixin
 from pytorch_widedeep.models.tabular.mlp._layers import MLP
 from pytorch_widedeep.models.tabular.resnet._layers import DenseResnet
 from pytorch_widedeep.models.tabular._base_tabular_model import (
+    MixedPrecisionMixin,
     BaseTabularModelWithoutAttention,
+    quantize_linear_layers,
 )
 
 
-class TabResnet(BaseTabularModelWithoutAttention):
+class TabResnet(
+    MixedPrecisionMixin, LazyCompileMixin, BaseTabularModelWithoutAttention
+):
     r"""Defines a ``TabResnet`` model that can be used as the ``deeptabular``
     component of a Wide & Deep model or independently by itself.
 
@@ -16,15 +23,30 @@ class TabResnet(BaseTabularModelWithoutAttention):
     :obj:`pytorch_widedeep.models.tab_resnet._layers` for details on the
     structure of each block.
 
+    The embeddings of the categorical columns that share the same embedding
+    dimension are stored in a single table, so they are computed with one
+    lookup per embedding dimension. See
+    :obj:`pytorch_widedeep.models.tabular.embeddings_layers.FusedDiffSizeCatEmbeddings`
+
+    .. note:: The continuous columns are cast to ``float32`` in the forward
+        pass. If the input tensor is already ``float32`` no copy is made.
+
+    .. note:: When gradients are disabled (e.g. under ``torch.no_grad()``),
+        the concatenation of the categorical and continuous embeddings is
+        written into a buffer that is re-used across forward passes. As a
+        result, a model instance is not thread-safe in this mode: threads
+        running inference concurrently must use their own copy of the model.
+
     Parameters
     ----------
     column_idx: Dict
         Dict containing the index of the columns that will be passed through
         the model. Required to slice the tensors. e.g.
         {'education': 0, 'relationship': 1, 'workclass': 2, ...}
-    cat_embed_input: List
+    cat_embed_input: List, Optional, default = None
         List of Tuples with the column name, number of unique values and
-        embedding dimension. e.g. [(education, 11, 32), ...].
+        embedding dimension. e.g. [(education, 11, 32), ...]. If ``None`` or
+        an empty list, only the continuous columns are used
     cat_embed_dropout: float, default = 0.1
         Categorical embeddings dropout
     use_cat_bias: bool, default = False,
@@ -62,6 +84,10 @@ class TabResnet(BaseTabularModelWithoutAttention):
         Boolean indicating if the simplest possible residual blocks (``X -> [
         [LIN, BN, ACT]  + X ]``) will be used instead of a standard one
         (``X -> [ [LIN1, BN1, ACT1] -> [LIN2, BN2]  + X ]``).
+    blocks_norm_layer: str, default = "batchnorm"
+        Type of normalization layer used in the Resnet blocks. Options are:
+        'batchnorm' or 'layernorm'. Layer normalization does not depend on
+        the batch statistics and therefore works with any batch size.
     mlp_hidden_dims: List, Optional, default = None
         List with the number of neurons per dense layer in the MLP. e.g:
         [64, 32]. If ``None`` the  output of the Resnet Blocks will be
@@ -82,6 +108,12 @@ class TabResnet(BaseTabularModelWithoutAttention):
         Boolean indicating the order of the operations in the dense
         layer. If ``True: [LIN -> ACT -> BN -> DP]``. If ``False: [BN -> DP ->
         LIN -> ACT]``
+    compile_embeddings: bool, default = False
+        Boolean indicating if the computation of the embeddings (lookup,
+        dropout, normalization of the continuous columns and concatenation)
+        will be compiled with ``torch.compile`` so that the small
+        element-wise operations are fused. The compilation happens at the
+        first forward pass
 
     Attributes
     ----------
@@ -128,13 +160,20 @@ class TabResnet(BaseTabularModelWithoutAttention):
         blocks_dims: List[int] = [200, 100, 100],
         blocks_dropout: float = 0.1,
         simplify_blocks: bool = False,
+        blocks_norm_layer: str = "batchnorm",
         mlp_hidden_dims: Optional[List[int]] = None,
         mlp_activation: str = "relu",
         mlp_dropout: float = 0.1,
         mlp_batchnorm: bool = False,
         mlp_batchnorm_last: bool = False,
         mlp_linear_first: bool = False,
+        compile_embeddings: bool = False,
     ):
+        if not cat_embed_input and not continuous_cols:
+            raise ValueError(
+                "Either 'cat_embed_input' or 'continuous_cols' must be provided"
+            )
+
         super(TabResnet, self).__init__(
             column_idx=column_idx,
             cat_embed_input=cat_embed_input,
@@ -148,6 +187,7 @@ class TabResnet(BaseTabularModelWithoutAttention):
             cont_embed_dropout=cont_embed_dropout,
             use_cont_bias=use_cont_bias,
             cont_embed_activation=cont_embed_activation,
+            fused_cat_embed=True,
         )
 
         if len(blocks_dims) < 2:
@@ -158,6 +198,7 @@ class TabResnet(BaseTabularModelWithoutAttention):
         self.blocks_dims = blocks_dims
         self.blocks_dropout = blocks_dropout
         self.simplify_blocks = simplify_blocks
+        self.blocks_norm_layer = blocks_norm_layer
 
         self.mlp_hidden_dims = mlp_hidden_dims
         self.mlp_activation = mlp_activation
@@ -166,6 +207,8 @@ class TabResnet(BaseTabularModelWithoutAttention):
         self.mlp_batchnorm_last = mlp_batchnorm_last
         self.mlp_linear_first = mlp_linear_first
 
+        self.compile_embeddings = compile_embeddings
+
         # Embeddings are instantiated at the base model
         cat_out_dim = self.cat_and_cont_embed.cat_out_dim
         cont_out_dim = self.cat_and_cont_embed.cont_out_dim
@@ -173,7 +216,11 @@ class TabResnet(BaseTabularModelWithoutAttention):
         # Resnet
         dense_resnet_input_dim = cat_out_dim + cont_out_dim
         self.tab_resnet_blks = DenseResnet(
-            dense_resnet_input_dim, blocks_dims, blocks_dropout, self.simplify_blocks
+            dense_resnet_input_dim,
+            blocks_dims,
+            blocks_dropout,
+            self.simplify_blocks,
+            self.blocks_norm_layer,
         )
 
         # Mlp
@@ -191,9 +238,133 @@ class TabResnet(BaseTabularModelWithoutAttention):
         else:
             self.output_dim = blocks_dims[-1]
 
+        self._cat_buf: Optional[Tensor] = None
+
     def forward(self, X: Tensor) -> Tensor:
-        x = self._get_embeddings(X)
-        x = self.tab_resnet_blks(x)
-        if self.mlp_hidden_dims is not None:
-            x = self.tab_resnet_mlp(x)
-        return x
+        with self._autocast(X):
+            x = self._embeddings_fn()(X)
+            x = self.tab_resnet_blks(x)
+            if self.mlp_hidden_dims is not None:
+                x = self.tab_resnet_mlp(x)
+        return x.float() if self.amp_dtype is not None else x
+
+    def _get_embeddings(self, X: Tensor) -> Tensor:
+        # during inference the concatenation of the categorical and
+        # continuous embeddings is written into a buffer that is reused
+        # across calls, avoiding one allocation per batch
+        embed = self.cat_and_cont_embed
+        if torch.is_grad_enabled() or not (embed.cat_out_dim and embed.cont_out_dim):
+            return super()._get_embeddings(X)
+        return super()._get_embeddings(X, out=self._embeddings_buffer(X))
+
+    def _embeddings_buffer(self, X: Tensor) -> Tensor:
+        # the buffer is sized to the largest batch seen so far, so that
+        # smaller batches (e.g. the last one in 'predict') do not reallocate
+        # it. Both the categorical and continuous embeddings are float32
+        if (
+            self._cat_buf is None
+            or self._cat_buf.size(0) < X.size(0)
+            or self._cat_buf.device != X.device
+            or self._cat_buf.is_inference() != torch.is_inference_mode_enabled()
+        ):
+            self._cat_buf = torch.empty(
+                X.size(0),
+                self.cat_and_cont_embed.output_dim,
+                dtype=torch.float32,
+                device=X.device,
+            )
+        return self._cat_buf[: X.size(0)]
+
+    def _embeddings_fn(self) -> Callable:
+        # when compiled, the re-usable buffer in '_get_embeddings' is not
+        # used since the compiled graph allocates its own output
+        if not self.compile_embeddings:
+            return self._get_embeddings
+        return self._lazy_compile(
+            "embeddings",
+            super(TabResnet, self)._get_embeddings,
+            mode="reduce-overhead",
+            dynamic=True,
+        )
+
+    def __getstate__(self):
+        # the inference buffer is not part of the model's state
+        state = super().__getstate__()
+        state["_cat_buf"] = None
+        return state
+
+    def fuse_cont_bn(self):
+        r"""Folds the batch normalization layer applied to the continuous
+        columns into the input linear layer of the Resnet blocks, so that
+        the normalization is not computed at inference time. Must be called
+        in eval mode, i.e. after ``model.eval()``
+
+        This is only possible if the continuous columns are not embedded
+        (and no activation is applied to them) and the Resnet blocks have an
+        input linear layer (i.e. the input dimension is different from
+        ``blocks_dims[0]``)
+        """
+        if self.training:
+            raise ValueError("'fuse_cont_bn' can only be used in eval mode")
+
+        cont_norm = getattr(self.cat_and_cont_embed, "cont_norm", None)
+        if not isinstance(cont_norm, nn.BatchNorm1d):
+            return
+
+        lin = getattr(self.tab_resnet_blks.dense_resnet, "lin_inp", None)
+        if self.embed_continuous or self.cont_embed_act_fn is not None or lin is None:
+            raise ValueError(
+                "The batch normalization of the continuous columns can only be "
+                "fused if these are not embedded nor activated and the Resnet "
+                "blocks have an input linear layer"
+            )
+
+        # BN(x) = x * scale + shift
+        scale = torch.rsqrt(cont_norm.running_var + cont_norm.eps)
+        shift = -cont_norm.running_mean * scale
+        if cont_norm.affine:
+            scale = scale * cont_norm.weight
+            shift = shift * cont_norm.weight + cont_norm.bias
+
+        # the continuous columns are the last ones in the input
+        n_cont = self.cat_and_cont_embed.cont_out_dim
+        fused_lin = nn.Linear(lin.in_features, lin.out_features).to(
+            lin.weight.device, lin.weight.dtype
+        )
+        with torch.no_grad():
+            weight = lin.weight.clone()
+            bias = (
+                lin.bias.clone()
+                if lin.bias is not None
+                else torch.zeros_like(fused_lin.bias)
+            )
+            bias += weight[:, -n_cont:] @ shift
+            weight[:, -n_cont:] *= scale
+            fused_lin.weight.copy_(weight)
+            fused_lin.bias.copy_(bias)
+
+        self.tab_resnet_blks.dense_resnet.lin_inp = fused_lin.train(False)
+        self.cat_and_cont_embed.cont_norm = nn.Identity()
+
+    def quantize_for_inference(self, backend: Optional[str] = None) -> "TabResnet":
+        r"""Returns a copy of the model, in eval mode, where the linear
+        layers of the Resnet blocks and of the MLP (if any) are dynamically
+        quantized to ``int8``. The embeddings and the normalization layers
+        remain in full precision. Only meant to be used for inference on CPU
+
+        Parameters
+        ----------
+        backend: str, Optional, default = None
+            Quantized engine used to quantize the linear layers. One of
+            ``torch.backends.quantized.supported_engines``. If ``None`` the
+            current ``torch.backends.quantized.engine`` is used. The global
+            engine is restored afterwards
+
+        Returns
+        -------
+        TabResnet
+            The quantized copy of the model
+        """
+        return quantize_linear_layers(
+            self, ["tab_resnet_blks", "tab_resnet_mlp"], backend
+        )
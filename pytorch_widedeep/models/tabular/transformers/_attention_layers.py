@@ -7,6 +7,7 @@ import math
 
 import torch
 import einops
+import torch.nn.functional as F
 from torch import nn, einsum
 
 from pytorch_widedeep.wdtypes import *  # noqa: F403
@@ -67,6 +68,7 @@ class MultiHeadedAttention(nn.Module):
         use_bias: bool,
         dropout: float,
         query_dim: Optional[int] = None,
+        need_weights: bool = True,
     ):
         super(MultiHeadedAttention, self).__init__()
 
@@ -74,6 +76,9 @@ class MultiHeadedAttention(nn.Module):
 
         self.head_dim = input_dim // n_heads
         self.n_heads = n_heads
+        # if the attention weights are not needed, use the (fused)
+        # scaled_dot_product_attention
+        self.need_weights = need_weights
 
         self.dropout = nn.Dropout(dropout)
 
@@ -98,11 +103,18 @@ class MultiHeadedAttention(nn.Module):
             lambda t: einops.rearrange(t, "b m (h d) -> b h m d", h=self.n_heads),
             (q, k, v),
         )
-        scores = einsum("b h s d, b h l d -> b h s l", q, k) / math.sqrt(self.head_dim)
-        attn_weights = scores.softmax(dim=-1)
-        self.attn_weights = attn_weights
-        attn_weights = self.dropout(attn_weights)
-        attn_output = einsum("b h s l, b h l d -> b h s d", attn_weights, v)
+        if self.need_weights:
+            scores = einsum("b h s d, b h l d -> b h s l", q, k) / math.sqrt(
+                self.head_dim
+            )
+            attn_weights = scores.softmax(dim=-1)
+            self.attn_weights = attn_weights
+            attn_weights = self.dropout(attn_weights)
+            attn_output = einsum("b h s l, b h l d -> b h s d", attn_weights, v)
+        else:
+            attn_output = F.scaled_dot_product_attention(
+                q, k, v, dropout_p=self.dropout.p if self.training else 0.0
+            )
         output = einops.rearrange(attn_output, "b h s d -> b s (h d)", h=self.n_heads)
 
         if self.out_proj is not None:
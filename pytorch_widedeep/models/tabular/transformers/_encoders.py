@@ -21,6 +21,7 @@ class TransformerEncoder(nn.Module):
         attn_dropout: float,
         ff_dropout: float,
         activation: str,
+        need_weights: bool = True,
     ):
         super(TransformerEncoder, self).__init__()
 
@@ -29,6 +30,7 @@ class TransformerEncoder(nn.Module):
             n_heads,
             use_bias,
             attn_dropout,
+            need_weights=need_weights,
         )
         self.ff = FeedForward(input_dim, ff_dropout, activation)
 
@@ -1,17 +1,25 @@
+from itertools import islice
+
 import torch
+import torch.nn.functional as F
 from torch import nn
 
 from pytorch_widedeep.wdtypes import *  # noqa: F403
+from pytorch_widedeep.models._lazy_compile import LazyCompileMixin
 from pytorch_widedeep.models.tabular.mlp._layers import MLP
 from pytorch_widedeep.models.tabular._base_tabular_model import (
+    MixedPrecisionMixin,
     BaseTabularModelWithAttention,
+    quantize_linear_layers,
 )
 from pytorch_widedeep.models.tabular.transformers._encoders import (
     TransformerEncoder,
 )
 
 
-class TabTransformer(BaseTabularModelWithAttention):
+class TabTransformer(
+    MixedPrecisionMixin, LazyCompileMixin, BaseTabularModelWithAttention
+):
     r"""Defines a `TabTransformer model <https://arxiv.org/abs/2012.06678>`_ that
     can be used as the ``deeptabular`` component of a Wide & Deep model or
     independently by itself.
@@ -106,6 +114,17 @@ class TabTransformer(BaseTabularModelWithAttention):
         Boolean indicating whether the order of the operations in the dense
         layer. If ``True: [LIN -> ACT -> BN -> DP]``. If ``False: [BN -> DP ->
         LIN -> ACT]``
+    collect_attn_weights: bool, default = True
+        Boolean indicating if the attention weights will be stored at every
+        forward pass (see the ``attention_weights`` property). If ``False``
+        the attention is computed with
+        ``torch.nn.functional.scaled_dot_product_attention``, which uses
+        fused kernels when available and does not materialise the weights
+    compile_blocks: bool, default = False
+        Boolean indicating if the Transformer blocks will be compiled with
+        ``torch.compile`` so that the layer norms, residual connections and
+        element-wise operations are fused across blocks. The compilation
+        happens at the first forward pass
 
     Attributes
     ----------
@@ -162,6 +181,8 @@ class TabTransformer(BaseTabularModelWithAttention):
         mlp_batchnorm: bool = False,
         mlp_batchnorm_last: bool = False,
         mlp_linear_first: bool = True,
+        collect_attn_weights: bool = True,
+        compile_blocks: bool = False,
     ):
         super(TabTransformer, self).__init__(
             column_idx=column_idx,
@@ -196,6 +217,9 @@ class TabTransformer(BaseTabularModelWithAttention):
         self.mlp_batchnorm_last = mlp_batchnorm_last
         self.mlp_linear_first = mlp_linear_first
 
+        self.collect_attn_weights = collect_attn_weights
+        self.compile_blocks = compile_blocks
+
         self.with_cls_token = "cls_token" in column_idx
         self.n_cat = len(cat_embed_input) if cat_embed_input is not None else 0
         self.n_cont = len(continuous_cols) if continuous_cols is not None else 0
@@ -218,6 +242,7 @@ class TabTransformer(BaseTabularModelWithAttention):
                     attn_dropout,
                     ff_dropout,
                     transformer_activation,
+                    collect_attn_weights,
                 ),
             )
 
@@ -245,29 +270,32 @@ class TabTransformer(BaseTabularModelWithAttention):
         self.output_dim: int = mlp_hidden_dims[-1]
 
     def forward(self, X: Tensor) -> Tensor:
+        with self._autocast(X):
+            if not self.embed_continuous:
+                x_cat, x_cont = self.cat_and_cont_embed(X)
+                if x_cat is not None:
+                    x = (
+                        self.cat_embed_act_fn(x_cat)
+                        if self.cat_embed_act_fn is not None
+                        else x_cat
+                    )
+            else:
+                x = self._get_embeddings(X)
+                x_cont = None
 
-        if not self.embed_continuous:
-            x_cat, x_cont = self.cat_and_cont_embed(X)
-            if x_cat is not None:
-                x = (
-                    self.cat_embed_act_fn(x_cat)
-                    if self.cat_embed_act_fn is not None
-                    else x_cat
-                )
-        else:
-            x = self._get_embeddings(X)
-            x_cont = None
-
-        x = self.transformer_blks(x)
-        if self.with_cls_token:
-            x = x[:, 0, :]
-        else:
-            x = x.flatten(1)
-
-        if x_cont is not None and not self.embed_continuous:
-            x = torch.cat([x, x_cont], 1)
+            x = self._transformer_blks_fn()(x)
+            if self.with_cls_token:
+                x = x.select(1, 0)
+            else:
+                # the output of the blocks (a LayerNorm) is contiguous, so
+                # this is a view and never a copy
+                x = x.contiguous().view(x.size(0), -1)
 
-        return self.transformer_mlp(x)
+            if x_cont is not None and not self.embed_continuous:
+                x = self._mlp_with_cont(x, x_cont)
+            else:
+                x = self.transformer_mlp(x)
+        return x.float() if self.amp_dtype is not None else x
 
     @property
     def attention_weights(self) -> List:
@@ -279,9 +307,82 @@ class TabTransformer(BaseTabularModelWithAttention):
 
         Where *N* is the batch size, *H* is the number of attention heads
         and *F* is the number of features/columns in the dataset
+
+        The weights are only stored if ``collect_attn_weights`` is ``True``
+        (default)
         """
+        self._check_attn_weights_collected()
         return [blk.attn.attn_weights for blk in self.transformer_blks]
 
+    @property
+    def attention_weights_stacked(self) -> Tensor:
+        r"""Tensor with the attention weights of all blocks, detached from
+        the graph
+
+        The shape of the attention weights is:
+
+        :math:`(B, N, H, F, F)`
+
+        Where *B* is the number of blocks, *N* is the batch size, *H* is the
+        number of attention heads and *F* is the number of features/columns
+        in the dataset
+        """
+        self._check_attn_weights_collected()
+        return torch.stack(
+            [blk.attn.attn_weights.detach() for blk in self.transformer_blks]
+        )
+
+    def quantize_for_inference(self, backend: Optional[str] = None) -> "TabTransformer":
+        r"""Returns a copy of the model, in eval mode, where the linear
+        layers of the MLP on top of the transformer blocks are dynamically
+        quantized to ``int8``. The embeddings and the attention blocks remain
+        in full precision. Only meant to be used for inference on CPU
+
+        Parameters
+        ----------
+        backend: str, Optional, default = None
+            Quantized engine used to quantize the linear layers. One of
+            ``torch.backends.quantized.supported_engines``. If ``None`` the
+            current ``torch.backends.quantized.engine`` is used. The global
+            engine is restored afterwards
+
+        Returns
+        -------
+        TabTransformer
+            The quantized copy of the model
+        """
+        return quantize_linear_layers(self, ["transformer_mlp"], backend)
+
+    def _mlp_with_cont(self, x: Tensor, x_cont: Tensor) -> Tensor:
+        # If the MLP starts with a linear layer, applying the two column
+        # blocks of its weight matrix to x and x_cont and adding the results
+        # is the same as applying it to torch.cat([x, x_cont], 1), without
+        # materialising the concatenation
+        first_layer = self.transformer_mlp.mlp[0]
+        lin = first_layer[0]
+        if not isinstance(lin, nn.Linear):
+            return self.transformer_mlp(torch.cat([x, x_cont], 1))
+
+        n = x.size(1)
+        out = F.linear(x, lin.weight[:, :n], lin.bias) + F.linear(
+            x_cont, lin.weight[:, n:]
+        )
+        for layer in islice(first_layer, 1, None):
+            out = layer(out)
+        for dense_layer in islice(self.transformer_mlp.mlp, 1, None):
+            out = dense_layer(out)
+        return out
+
+    def _transformer_blks_fn(self) -> Callable:
+        if not self.compile_blocks:
+            return self.transformer_blks
+        return self._lazy_compile(
+            "transformer_blks",
+            self.transformer_blks.forward,
+            mode="reduce-overhead",
+            dynamic=False,
+        )
+
     def _compute_attn_output_dim(self) -> int:
 
         if self.with_cls_token:
@@ -43,6 +43,9 @@ from pytorch_widedeep.training._loss_and_obj_aliases import _ObjectiveToMethod
 from pytorch_widedeep.training._multiple_lr_scheduler import (
     MultipleLRScheduler,
 )
+from pytorch_widedeep.models.tabular.embeddings_layers import (
+    FusedDiffSizeCatEmbeddings,
+)
 
 
 class Trainer:
@@ -746,6 +749,11 @@ class Trainer:
         for n, p in self.model.named_parameters():
             if "embed_layers" in n and col_name in n:
                 embed_mtx = p.cpu().data.numpy()
+        for m in self.model.modules():
+            if isinstance(m, FusedDiffSizeCatEmbeddings) and col_name in [
+                ei[0] for ei in m.embed_input
+            ]:
+                embed_mtx = m.col_embeddings(col_name).cpu().data.numpy()
         encoding_dict = cat_encoding_dict[col_name]
         inv_encoding_dict = {v: k for k, v in encoding_dict.items()}
         cat_embed_dict = {}
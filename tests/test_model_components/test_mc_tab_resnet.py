@@ -5,6 +5,10 @@ import torch
 import pytest
 
 from pytorch_widedeep.models import TabResnet
+from pytorch_widedeep.models.tabular.embeddings_layers import (
+    DiffSizeCatEmbeddings,
+    FusedDiffSizeCatEmbeddings,
+)
 
 colnames = list(string.ascii_lowercase)[:10]
 embed_cols = [np.random.choice(np.arange(5), 10) for _ in range(5)]
@@ -115,3 +119,310 @@ def test_full_model(use_bias, simplify_blocks, embed_continuous):
     out = model(X_tab)
 
     assert out.size(0) == 10 and out.size(1) == model.output_dim
+
+
+###############################################################################
+# Fused embeddings are equivalent to the per-column embeddings
+###############################################################################
+
+
+@pytest.mark.parametrize(
+    "embed_dims",
+    [
+        [16] * 5,
+        [4, 8, 16, 8, 4],
+        [8, 8, 8, 16, 16],
+    ],
+)
+@pytest.mark.parametrize(
+    "use_bias",
+    [
+        True,
+        False,
+    ],
+)
+def test_fused_cat_embeddings(embed_dims, use_bias):
+    column_idx = {k: v for v, k in enumerate(colnames)}
+    _embed_input = [(u, 5, j) for u, j in zip(colnames[:5], embed_dims)]
+    per_col = DiffSizeCatEmbeddings(column_idx, _embed_input, 0.0, use_bias)
+    fused = FusedDiffSizeCatEmbeddings(column_idx, _embed_input, 0.0, use_bias)
+    for col, _, dim in _embed_input:
+        per_col.embed_layers["emb_layer_" + col].weight.data[1:] = fused.col_embeddings(
+            col
+        ).data[1:]
+    if use_bias:
+        for (col, _, dim), b in zip(_embed_input, fused.bias.data.split(embed_dims)):
+            per_col.biases["bias_" + col].data = b.clone()
+
+    X = X_tab.clone()
+    X[0, :5] = 0  # unseen categories
+    assert torch.allclose(per_col(X), fused(X))
+    assert len(fused.embed) == len(set(embed_dims)) and not any(
+        torch.any(emb.weight[0].bool()) for emb in fused.embed.values()
+    )
+
+
+@pytest.mark.parametrize(
+    "use_bias",
+    [
+        True,
+        False,
+    ],
+)
+def test_load_per_column_state_dict(use_bias):
+    column_idx = {k: v for v, k in enumerate(colnames)}
+    _embed_input = [(u, 5, j) for u, j in zip(colnames[:5], [4, 8, 16, 8, 4])]
+    params = dict(
+        column_idx=column_idx,
+        cat_embed_input=_embed_input,
+        use_cat_bias=use_bias,
+        continuous_cols=continuous_cols,
+        blocks_dims=[32, 16],
+    )
+
+    # a TabResnet with the per-column embeddings used before the fused ones
+    old_model = TabResnet(**params)
+    old_model.cat_and_cont_embed.cat_embed = DiffSizeCatEmbeddings(
+        column_idx, _embed_input, 0.0, use_bias
+    )
+    old_model.eval()
+    state_dict = old_model.state_dict()
+
+    model = TabResnet(**params)
+    model.load_state_dict(state_dict)
+    model.eval()
+
+    X = X_tab.clone()
+    X[0, :5] = 0  # unseen categories
+    assert any("embed_layers" in k for k in state_dict) and torch.allclose(
+        old_model(X), model(X)
+    )
+
+
+###############################################################################
+# Folding the BN layers into the linear layers for inference
+###############################################################################
+
+
+@pytest.mark.parametrize(
+    "simplify_blocks",
+    [
+        True,
+        False,
+    ],
+)
+def test_fuse_for_inference(simplify_blocks):
+    model = TabResnet(
+        column_idx={k: v for v, k in enumerate(colnames)},
+        cat_embed_input=embed_input,
+        continuous_cols=continuous_cols,
+        blocks_dims=[32, 16, 8],
+        simplify_blocks=simplify_blocks,
+    )
+    # populate the running stats
+    for _ in range(3):
+        model(X_tab)
+    model.eval()
+    out = model(X_tab)
+
+    model.tab_resnet_blks.fuse_for_inference()
+    fused_out = model(X_tab)
+
+    n_bn = sum(
+        isinstance(m, torch.nn.BatchNorm1d) for m in model.tab_resnet_blks.modules()
+    )
+    assert n_bn == 0 and torch.allclose(out, fused_out, atol=1e-5)
+
+
+###############################################################################
+# Mixed precision
+###############################################################################
+
+
+@pytest.mark.parametrize(
+    "precision",
+    [
+        "bfloat16",
+        "float16",
+    ],
+)
+def test_set_precision(precision):
+    model = TabResnet(
+        column_idx={k: v for v, k in enumerate(colnames)},
+        cat_embed_input=embed_input,
+        continuous_cols=continuous_cols,
+        blocks_dims=[32, 16],
+        mlp_hidden_dims=[16, 8],
+    )
+    if precision == "float16":
+        with pytest.warns(UserWarning):
+            model.set_precision(precision)
+    else:
+        model.set_precision(precision)
+    out = model(X_tab)
+    with pytest.raises(ValueError):
+        model.set_precision("int8")
+    assert out.dtype == torch.float32 and out.size(1) == model.output_dim
+
+
+def test_quantize_for_inference():
+    model = TabResnet(
+        column_idx={k: v for v, k in enumerate(colnames)},
+        cat_embed_input=embed_input,
+        continuous_cols=continuous_cols,
+        blocks_dims=[32, 16],
+        mlp_hidden_dims=[16, 8],
+    )
+    model.eval()
+    out = model(X_tab)
+    engine = torch.backends.quantized.engine
+    q_model = model.quantize_for_inference()
+    q_out = q_model(X_tab)
+    assert torch.backends.quantized.engine == engine
+    with pytest.raises(ValueError):
+        model.quantize_for_inference(backend="wrong_backend")
+    assert (
+        model.tab_resnet_blks.dense_resnet.block_0.lin1.__class__ is torch.nn.Linear
+        and q_model.tab_resnet_blks.dense_resnet.block_0.lin1.__class__
+        is not torch.nn.Linear
+        and q_out.shape == out.shape
+        and torch.allclose(out, q_out, atol=0.1)
+    )
+
+
+###############################################################################
+# Empty cat_embed_input
+###############################################################################
+
+
+def test_tab_resnet_empty_cat_embed_input():
+    model = TabResnet(
+        column_idx={k: v for v, k in enumerate(colnames)},
+        cat_embed_input=[],
+        continuous_cols=continuous_cols,
+        blocks_dims=[32, 16],
+    )
+    out = model(X_tab)
+    assert (
+        not hasattr(model.cat_and_cont_embed, "cat_embed")
+        and out.size(0) == 10
+        and out.size(1) == 16
+    )
+
+
+def test_tab_resnet_no_columns():
+    with pytest.raises(ValueError):
+        TabResnet(column_idx={k: v for v, k in enumerate(colnames)}, cat_embed_input=[])
+
+
+###############################################################################
+# Reusing the embeddings buffer during inference
+###############################################################################
+
+
+def test_inference_embeddings_buffer(tmp_path):
+    model = TabResnet(
+        column_idx={k: v for v, k in enumerate(colnames)},
+        cat_embed_input=embed_input,
+        continuous_cols=continuous_cols,
+        blocks_dims=[32, 16],
+    )
+    model.eval()
+    out = model(X_tab)
+    with torch.no_grad():
+        out_no_grad = model(X_tab)
+        buf_ptr = model._cat_buf.data_ptr()
+        # a smaller batch re-uses the buffer allocated for the largest one
+        out_no_grad_half = model(X_tab[:5])
+        same_buf = model._cat_buf.data_ptr() == buf_ptr
+    with torch.inference_mode():
+        out_inference = model(X_tab)
+
+    torch.save(model, tmp_path / "model.pt")
+    loaded_model = torch.load(tmp_path / "model.pt", weights_only=False)
+
+    assert (
+        torch.allclose(out, out_no_grad)
+        and torch.allclose(out[:5], out_no_grad_half)
+        and torch.allclose(out, out_inference)
+        and same_buf
+        and model._cat_buf.size(0) == 10
+        and loaded_model._cat_buf is None
+    )
+
+
+###############################################################################
+# LayerNorm in the Resnet blocks
+###############################################################################
+
+
+def test_tab_resnet_layernorm_blocks():
+    model = TabResnet(
+        column_idx={k: v for v, k in enumerate(colnames)},
+        cat_embed_input=embed_input,
+        continuous_cols=continuous_cols,
+        cont_norm_layer="layernorm",
+        blocks_dims=[32, 16, 8],
+        blocks_norm_layer="layernorm",
+    )
+    # BatchNorm1d would fail with a batch of size 1 in training mode
+    out = model(X_tab[:1])
+    n_bn = sum(isinstance(m, torch.nn.BatchNorm1d) for m in model.modules())
+    assert out.size(0) == 1 and out.size(1) == 8 and n_bn == 0
+
+
+def test_tab_resnet_wrong_norm_layer():
+    with pytest.raises(ValueError):
+        TabResnet(
+            column_idx={k: v for v, k in enumerate(colnames)},
+            cat_embed_input=embed_input,
+            blocks_dims=[32, 16],
+            blocks_norm_layer="groupnorm",
+        )
+
+
+###############################################################################
+# Folding the BN of the continuous columns into the first linear layer
+###############################################################################
+
+
+@pytest.mark.parametrize(
+    "fuse_blocks_first",
+    [
+        True,
+        False,
+    ],
+)
+def test_fuse_cont_bn(fuse_blocks_first):
+    model = TabResnet(
+        column_idx={k: v for v, k in enumerate(colnames)},
+        cat_embed_input=embed_input,
+        continuous_cols=continuous_cols,
+        blocks_dims=[32, 16],
+    )
+    for _ in range(3):
+        model(X_tab)
+    model.eval()
+    out = model(X_tab)
+
+    if fuse_blocks_first:
+        model.tab_resnet_blks.fuse_for_inference()
+    model.fuse_cont_bn()
+    fused_out = model(X_tab)
+
+    assert isinstance(
+        model.cat_and_cont_embed.cont_norm, torch.nn.Identity
+    ) and torch.allclose(out, fused_out, atol=1e-5)
+
+
+def test_fuse_cont_bn_embed_continuous():
+    model = TabResnet(
+        column_idx={k: v for v, k in enumerate(colnames)},
+        cat_embed_input=embed_input,
+        continuous_cols=continuous_cols,
+        embed_continuous=True,
+        blocks_dims=[32, 16],
+    )
+    model.eval()
+    with pytest.raises(ValueError):
+        model.fuse_cont_bn()
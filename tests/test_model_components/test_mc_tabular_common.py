@@ -0,0 +1,129 @@
+import string
+
+import numpy as np
+import torch
+import pytest
+from torch import nn
+
+from pytorch_widedeep.models import (
+    TabResnet,
+    TabTransformer,
+    SelfAttentionMLP,
+    ContextAttentionMLP,
+)
+from pytorch_widedeep.models._lazy_compile import LazyCompileMixin
+
+colnames = list(string.ascii_lowercase)[:10]
+embed_cols = [np.random.choice(np.arange(5), 10) for _ in range(5)]
+embed_input = [(u, i, j) for u, i, j in zip(colnames[:5], [5] * 5, [16] * 5)]
+attn_embed_input = [(u, i) for u, i in zip(colnames[:5], [5] * 5)]
+cont_cols = [np.random.rand(10) for _ in range(5)]
+continuous_cols = colnames[-5:]
+
+X_tab = torch.from_numpy(np.vstack(embed_cols + cont_cols).transpose())
+
+
+###############################################################################
+# Pickling models with lazily compiled functions
+###############################################################################
+
+
+class LazyCompiledLinear(LazyCompileMixin, nn.Module):
+    def __init__(self):
+        super(LazyCompiledLinear, self).__init__()
+        self.linear = nn.Linear(5, 1)
+
+    def forward(self, X):
+        return self._lazy_compile("linear", self.linear.forward)(X)
+
+
+@pytest.mark.parametrize(
+    "module_compile",
+    [
+        True,
+        False,
+    ],
+)
+def test_lazy_compile_pickle(tmp_path, module_compile):
+    X = torch.rand(10, 5)
+
+    model = LazyCompiledLinear()
+    if module_compile:
+        model.compile()
+    out = model(X)
+
+    torch.save(model, tmp_path / "model.pt")
+    loaded_model = torch.load(tmp_path / "model.pt", weights_only=False)
+
+    assert (
+        "_compiled_fns" in model.__dict__
+        and "_compiled_fns" not in loaded_model.__dict__
+        and torch.allclose(out, loaded_model(X))
+    )
+
+
+###############################################################################
+# Compiling parts of a model does not change its output
+###############################################################################
+
+
+@pytest.mark.parametrize(
+    "model_cls, cat_embed_input, compile_flag",
+    [
+        (TabResnet, embed_input, "compile_embeddings"),
+        (TabTransformer, attn_embed_input, "compile_blocks"),
+        (ContextAttentionMLP, embed_input, "compile_score"),
+    ],
+)
+def test_compile_flag(model_cls, cat_embed_input, compile_flag):
+    params = {
+        "column_idx": {k: v for v, k in enumerate(colnames)},
+        "cat_embed_input": cat_embed_input,
+        "continuous_cols": continuous_cols,
+    }
+
+    model = model_cls(**params)
+    model.eval()
+    out = model(X_tab)
+
+    compiled_model = model_cls(**params, **{compile_flag: True})
+    compiled_model.load_state_dict(model.state_dict())
+    compiled_model.eval()
+    compiled_out = compiled_model(X_tab)
+
+    assert torch.allclose(out, compiled_out, atol=1e-5)
+
+
+###############################################################################
+# Self attention without storing the weights (sdpa path)
+###############################################################################
+
+
+@pytest.mark.parametrize(
+    "model_cls, weights_attrs",
+    [
+        (SelfAttentionMLP, ["attention_weights"]),
+        (TabTransformer, ["attention_weights", "attention_weights_stacked"]),
+    ],
+)
+def test_without_attention_weights(model_cls, weights_attrs):
+    params = {
+        "column_idx": {k: v for v, k in enumerate(colnames)},
+        "cat_embed_input": attn_embed_input,
+        "continuous_cols": continuous_cols,
+    }
+
+    model = model_cls(**params)
+    model.eval()
+    out = model(X_tab)
+
+    no_weights_model = model_cls(**params, collect_attn_weights=False)
+    no_weights_model.load_state_dict(model.state_dict())
+    no_weights_model.eval()
+    sdpa_out = no_weights_model(X_tab)
+
+    for attr in weights_attrs:
+        with pytest.raises(ValueError):
+            getattr(no_weights_model, attr)
+
+    assert torch.allclose(out, sdpa_out, atol=1e-5)
@@ -55,11 +55,101 @@ def test_embeddings_have_padding():
     assert all(res)
 
 
+def test_cat_embeddings_bias_with_cls_token():
+    cat_embed = SameSizeCatEmbeddings(
+        embed_dim=8,
+        column_idx={k: v for v, k in enumerate(["cls_token"] + colnames)},
+        embed_input=[("cls_token", 1)] + embed_input,
+        embed_dropout=0.0,
+        use_bias=True,
+        full_embed_dropout=False,
+        shared_embed=False,
+        add_shared_embed=False,
+        frac_shared_embed=0.0,
+    )
+    out = cat_embed(X_tab_with_cls_token)
+    idx = X_tab_with_cls_token[:, : n_cols + 1].long()
+    expected = cat_embed.embed(idx)
+    expected[:, 1:] += cat_embed.bias
+    assert out.shape == (batch_size, n_cols + 1, 8) and torch.allclose(out, expected)
+
+
 def test_tabtransformer_output():
     out = model1(X_tab)
     assert out.size(0) == 10 and out.size(1) == (n_cols * 32 + len(cont_cols)) * 2
 
 
+@pytest.mark.parametrize(
+    "mlp_linear_first",
+    [True, False],
+)
+def test_tabtransformer_mlp_with_cont(mlp_linear_first):
+    model = TabTransformer(
+        column_idx={k: v for v, k in enumerate(colnames)},
+        cat_embed_input=embed_input,
+        continuous_cols=colnames[n_cols:],
+        mlp_linear_first=mlp_linear_first,
+    )
+    model.eval()
+    x_cat, x_cont = model.cat_and_cont_embed(X_tab)
+    x = model.transformer_blks(x_cat).flatten(1)
+    out = model.transformer_mlp(torch.cat([x, x_cont], 1))
+    assert torch.allclose(out, model(X_tab), atol=1e-5)
+
+
+def test_tabtransformer_attention_weights_stacked():
+    model = TabTransformer(
+        column_idx={k: v for v, k in enumerate(colnames)},
+        cat_embed_input=embed_input,
+        continuous_cols=colnames[n_cols:],
+        n_blocks=2,
+    )
+    model.eval()
+    model(X_tab)
+    attn_weights = model.attention_weights_stacked
+
+    assert attn_weights.shape == (2, 10, model.n_heads, n_cols, n_cols)
+
+
+def test_tabtransformer_set_precision():
+    model = TabTransformer(
+        column_idx={k: v for v, k in enumerate(colnames)},
+        cat_embed_input=embed_input,
+        continuous_cols=colnames[n_cols:],
+    )
+    model.set_precision("bfloat16")
+    out = model(X_tab)
+    model.set_precision(None)
+    assert out.dtype == torch.float32 and model.amp_dtype is None
+
+
+def test_tabtransformer_quantize_for_inference():
+    model = TabTransformer(
+        column_idx={k: v for v, k in enumerate(colnames)},
+        cat_embed_input=embed_input,
+        continuous_cols=colnames[n_cols:],
+        mlp_hidden_dims=[32, 16],
+    )
+    model.eval()
+    out = model(X_tab)
+    attn_weights = model.attention_weights
+    engine = torch.backends.quantized.engine
+    q_model = model.quantize_for_inference()
+    q_out = q_model(X_tab)
+    assert torch.backends.quantized.engine == engine
+    # the original model is left untouched
+    assert all(
+        w is blk.attn.attn_weights and w.grad_fn is not None
+        for w, blk in zip(attn_weights, model.transformer_blks)
+    )
+    assert (
+        model.transformer_mlp.mlp[0][0].__class__ is torch.nn.Linear
+        and q_model.transformer_mlp.mlp[0][0].__class__ is not torch.nn.Linear
+        and q_out.shape == out.shape
+        and torch.allclose(out, q_out, atol=0.1)
+    )
+
+
 ###############################################################################
 # Test SharedEmbeddings
 ###############################################################################
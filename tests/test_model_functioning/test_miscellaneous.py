@@ -465,6 +465,29 @@ def test_lds_component_with_dataset():
     assert dataset_with_lds.weights.shape[0] == 32
 
 
+###############################################################################
+# test the X_tab dtype in the dataset
+###############################################################################
+
+
+@pytest.mark.parametrize(
+    "dtype",
+    ["float64", "float32", "int64"],
+)
+def test_dataset_X_tab_dtype(dtype):
+
+    X = X_tab.astype(dtype)
+    # label encodings above 2**24 are not exactly representable in float32
+    X[0, 0] = 2**24 + 1
+    dataset = WideDeepDataset(X_tab=X, target=target)
+
+    assert (
+        dataset.X_tab is X
+        and dataset.X_tab.dtype == dtype
+        and dataset[0][0].deeptabular[0] == 2**24 + 1
+    )
+
+
 ###############################################################################
 # test Trainer _extract_kwargs
 ###############################################################################